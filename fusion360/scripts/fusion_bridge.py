@@ -15,21 +15,81 @@ Usage:
 """
 
 import json
+import mmap
 import os
+import struct
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 BASE_DIR = os.path.expanduser("~/Documents/scripts/fusion_360/ClaudeBridge")
 COMMANDS_FILE = os.path.join(BASE_DIR, "commands.json")
 RESULTS_FILE = os.path.join(BASE_DIR, "results.json")
+MMAP_FILE = os.path.join(BASE_DIR, "bridge.mmf")
+LOCK_FILE = os.path.join(BASE_DIR, "bridge.lock")
+
+# Shared-memory layout (used when the add-in creates bridge.mmf).
+# The file holds one request slot in the lower half and one response slot in
+# the upper half. Each slot is: u32 sequence counter, u32 payload length,
+# then the JSON payload bytes. The sequence counter is written last so the
+# other side never observes a half-written payload.
+MMAP_SIZE = 1024 * 1024
+REQ_SEQ = 0
+REQ_LEN = 4
+REQ_BUF = 8
+RESP_SEQ = 512 * 1024
+RESP_LEN = RESP_SEQ + 4
+RESP_BUF = RESP_SEQ + 8
+MAX_PAYLOAD = RESP_SEQ - REQ_BUF
+RESPONSE_TIMEOUT = 30.0
+
+
+@contextmanager
+def _bridge_lock():
+    """Hold an exclusive lock for one command/result exchange.
+
+    Keeps two clients from interleaving writes to commands.json.
+    Best effort: a no-op on platforms without fcntl.
+    """
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(LOCK_FILE, os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
 
 
 class FusionBridge:
     """Helper class for interacting with Fusion 360 via ClaudeBridge."""
 
     def __init__(self):
+        self._mm = self._open_mmap()
         self.command_id = self._get_last_command_id()
 
+    def _open_mmap(self):
+        """Map the shared bridge file if the add-in has created it."""
+        try:
+            fd = os.open(MMAP_FILE, os.O_RDWR)
+        except OSError:
+            return None
+        try:
+            return mmap.mmap(fd, MMAP_SIZE)
+        except (OSError, ValueError):
+            return None
+        finally:
+            os.close(fd)
+
     def _get_last_command_id(self):
         """Get the last processed command ID."""
+        if self._mm is not None:
+            return struct.unpack_from("<I", self._mm, RESP_SEQ)[0]
         try:
             with open(RESULTS_FILE, 'r') as f:
                 data = json.load(f)
@@ -45,16 +105,75 @@ class FusionBridge:
             "action": action,
             "params": params or {}
         }
-
-        with open(COMMANDS_FILE, 'w') as f:
-            json.dump(cmd, f, indent=2)
-
+        if self._mm is not None:
+            return self._send_command_mmap(cmd)
+        return self._send_command_files(cmd)
+
+    def _send_command_mmap(self, cmd):
+        """Send a command through the shared memory-mapped file.
+
+        Writes the payload into the request slot, publishes it by bumping
+        the request sequence counter, then spins until the add-in stamps
+        the matching id into the response slot. Avoids the file open +
+        re-parse cost of the JSON fallback on every call.
+        """
+        mm = self._mm
+        buf = json.dumps(cmd).encode('utf-8')
+        if len(buf) > MAX_PAYLOAD:
+            return {"success": False, "error": "command too large for shared buffer"}
+
+        struct.pack_into("<I", mm, REQ_LEN, len(buf))
+        mm[REQ_BUF:REQ_BUF + len(buf)] = buf
+        # Publish last: the add-in only reads the payload after it sees
+        # the new sequence number.
+        struct.pack_into("<I", mm, REQ_SEQ, self.command_id)
+
+        # Spin for the first millisecond (fast add-in responses), then
+        # drop to short sleeps so a slow or absent add-in doesn't pin a
+        # core for the whole timeout.
+        start = time.monotonic()
+        deadline = start + RESPONSE_TIMEOUT
+        spin_until = start + 0.001
+        while struct.unpack_from("<I", mm, RESP_SEQ)[0] != self.command_id:
+            now = time.monotonic()
+            if now > deadline:
+                return {"success": False, "error": "timed out waiting for result"}
+            time.sleep(0 if now < spin_until else 0.0005)
+
+        length = struct.unpack_from("<I", mm, RESP_LEN)[0]
         try:
-            with open(RESULTS_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
+            return json.loads(mm[RESP_BUF:RESP_BUF + length].decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
             return {"success": False, "error": str(e)}
 
+    def _send_command_files(self, cmd):
+        """Fallback: send a command via the commands/results JSON files.
+
+        The command is written to a temp file and published with an
+        atomic os.replace so the add-in never reads half-written JSON,
+        then results.json is polled (with exponential backoff) until it
+        carries this command's id instead of being read back blindly.
+        """
+        with _bridge_lock():
+            tmp_file = COMMANDS_FILE + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(cmd, f, indent=2)
+            os.replace(tmp_file, COMMANDS_FILE)
+
+            deadline = time.monotonic() + RESPONSE_TIMEOUT
+            delay = 0.001
+            while time.monotonic() < deadline:
+                try:
+                    with open(RESULTS_FILE, 'r') as f:
+                        result = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    result = None
+                if result is not None and result.get('command_id') == cmd['id']:
+                    return result
+                time.sleep(delay)
+                delay = min(delay * 2, 0.064)
+            return {"success": False, "error": "timed out waiting for result"}
+
     # Connection commands
     def ping(self):
         """Test the bridge connection."""
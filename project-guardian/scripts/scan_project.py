@@ -7,265 +7,445 @@ Project Guardian - 项目扫描脚本
 
 import os
 import re
+import ast
+import mmap
 import json
 import argparse
 from pathlib import Path
 from collections import defaultdict
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Set, Tuple
 
+# orjson (Rust 实现) 序列化大依赖图比标准库快数倍，装了就用
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 # ============== 配置 ==============
 SUPPORTED_EXTENSIONS = {'.py', '.js', '.jsx', '.ts', '.tsx', '.vue', '.html'}
+EXT_TUPLE = tuple(SUPPORTED_EXTENSIONS)
 IGNORE_DIRS = {'node_modules', '__pycache__', '.git', 'venv', 'env', 'dist', 'build', '.next'}
 
+# 超过该大小的文件（压缩 JS、vendored HTML 等）只扫头尾各一块，
+# 它们不是手写的 UI 代码，全量扫描得不偿失；0 表示不限制
+MAX_SCAN_BYTES = 512_000
+_CHUNK_BYTES = 131072
+
 
 # ============== 模式检测 ==============
 
+# 各类别的检测指标：(类型, 描述, 指标正则列表)
+SAVE_CATEGORIES = [
+    ('realtime', '实时保存', [
+        rb'onChange\s*=.*save',
+        rb'onInput\s*=.*save',
+        rb'@input\s*=.*save',
+        rb'\.subscribe\(.*(?:save|update)',
+        rb'debounce.*save',
+        rb'autoSave',
+        rb'valueChanged.*emit',
+        rb'textChanged\.connect',
+        rb'currentTextChanged',
+    ]),
+    ('button', '按钮保存', [
+        rb'onClick\s*=.*save',
+        rb'onSubmit\s*=.*save',
+        rb'@click\s*=.*save',
+        rb'button.*save',
+        rb'submit.*button',
+        rb'clicked\.connect.*save',
+        'QPushButton.*保存'.encode('utf-8'),
+        rb'QPushButton.*Save',
+    ]),
+    ('on_close', '关闭时保存', [
+        rb'onClose.*save',
+        rb'beforeUnload.*save',
+        rb'closeEvent.*save',
+        rb'onDestroy.*save',
+        rb'componentWillUnmount.*save',
+    ]),
+]
+
+INPUT_CATEGORIES = [
+    ('dropdown', '下拉菜单', [
+        rb'<select',
+        rb'QComboBox',
+        rb'Dropdown',
+        rb'Select\s*>',
+        rb'v-select',
+        rb'el-select',
+    ]),
+    ('text_input', '文本输入框', [
+        rb'<input',
+        rb'QLineEdit',
+        rb'TextField',
+        rb'TextInput',
+        rb'v-model',
+    ]),
+    ('list_select', '列表选择', [
+        rb'QListWidget',
+        rb'ListView',
+        rb'ListBox',
+        rb'<ul.*selectable',
+    ]),
+    ('checkbox_radio', '复选框/单选框', [
+        rb'<input.*type=["\']checkbox',
+        rb'<input.*type=["\']radio',
+        rb'QCheckBox',
+        rb'QRadioButton',
+        rb'Checkbox',
+        rb'RadioButton',
+    ]),
+]
+
+
+def _combine_category(categories):
+    """把每个类别的指标列表合并为单个命名分组交替正则
+
+    每个类别只需一次扫描即可找出所有命中的指标，命名分组
+    (g0, g1, ...) 用于还原具体是哪个指标命中。
+    """
+    combined = []
+    for ptype, description, pats in categories:
+        regex = re.compile(
+            b'|'.join(b'(?P<g%d>%s)' % (i, p) for i, p in enumerate(pats)),
+            re.IGNORECASE)
+        combined.append((ptype, description, pats, regex))
+    return combined
+
+
+# 模块导入时编译一次，避免每个文件重复经过 re 缓存查找
+_SAVE_RES = _combine_category(SAVE_CATEGORIES)
+_INPUT_RES = _combine_category(INPUT_CATEGORIES)
+
+
 class PatternDetector:
     """检测代码中的交互模式"""
-    
+
     def __init__(self):
         self.save_patterns = defaultdict(list)
         self.input_patterns = defaultdict(list)
-    
-    def detect_save_pattern(self, content: str, filepath: str) -> List[Dict]:
-        """检测保存模式"""
+
+    def _detect(self, combined, content: bytes, filepath: str) -> List[Dict]:
+        """每个类别找到首个命中即停
+
+        下游 generate_patterns_md 每个类别一个文件只展示一行，
+        继续扫描剩余指标没有价值。
+        """
         patterns = []
-        
-        # 实时保存模式
-        realtime_indicators = [
-            r'onChange\s*=.*save',
-            r'onInput\s*=.*save',
-            r'@input\s*=.*save',
-            r'\.subscribe\(.*(save|update)',
-            r'debounce.*save',
-            r'autoSave',
-            r'valueChanged.*emit',
-            r'textChanged\.connect',
-            r'currentTextChanged',
-        ]
-        for indicator in realtime_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
+        for ptype, description, pats, regex in combined:
+            m = regex.search(content)
+            if m:
                 patterns.append({
-                    'type': 'realtime',
-                    'description': '实时保存',
+                    'type': ptype,
+                    'description': description,
                     'file': filepath,
-                    'indicator': indicator
+                    'indicator': pats[int(m.lastgroup[1:])].decode('utf-8')
                 })
-        
-        # 按钮保存模式
-        button_indicators = [
-            r'onClick\s*=.*save',
-            r'onSubmit\s*=.*save',
-            r'@click\s*=.*save',
-            r'button.*save',
-            r'submit.*button',
-            r'clicked\.connect.*save',
-            r'QPushButton.*保存',
-            r'QPushButton.*Save',
-        ]
-        for indicator in button_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                patterns.append({
-                    'type': 'button',
-                    'description': '按钮保存',
-                    'file': filepath,
-                    'indicator': indicator
-                })
-        
-        # 关闭时保存
-        close_indicators = [
-            r'onClose.*save',
-            r'beforeUnload.*save',
-            r'closeEvent.*save',
-            r'onDestroy.*save',
-            r'componentWillUnmount.*save',
-        ]
-        for indicator in close_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                patterns.append({
-                    'type': 'on_close',
-                    'description': '关闭时保存',
-                    'file': filepath,
-                    'indicator': indicator
-                })
-        
         return patterns
-    
-    def detect_input_pattern(self, content: str, filepath: str) -> List[Dict]:
+
+    def detect_save_pattern(self, content: bytes, filepath: str) -> List[Dict]:
+        """检测保存模式"""
+        return self._detect(_SAVE_RES, content, filepath)
+
+    def detect_input_pattern(self, content: bytes, filepath: str) -> List[Dict]:
         """检测输入模式"""
-        patterns = []
-        
-        # 下拉菜单
-        dropdown_indicators = [
-            r'<select',
-            r'QComboBox',
-            r'Dropdown',
-            r'Select\s*>',
-            r'v-select',
-            r'el-select',
-        ]
-        for indicator in dropdown_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                patterns.append({
-                    'type': 'dropdown',
-                    'description': '下拉菜单',
-                    'file': filepath,
-                    'indicator': indicator
-                })
-        
-        # 输入框
-        input_indicators = [
-            r'<input',
-            r'QLineEdit',
-            r'TextField',
-            r'TextInput',
-            r'v-model',
-        ]
-        for indicator in input_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                patterns.append({
-                    'type': 'text_input',
-                    'description': '文本输入框',
-                    'file': filepath,
-                    'indicator': indicator
-                })
-        
-        # 列表选择
-        list_indicators = [
-            r'QListWidget',
-            r'ListView',
-            r'ListBox',
-            r'<ul.*selectable',
-        ]
-        for indicator in list_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                patterns.append({
-                    'type': 'list_select',
-                    'description': '列表选择',
-                    'file': filepath,
-                    'indicator': indicator
-                })
-        
-        # 复选框/单选框
-        checkbox_indicators = [
-            r'<input.*type=["\']checkbox',
-            r'<input.*type=["\']radio',
-            r'QCheckBox',
-            r'QRadioButton',
-            r'Checkbox',
-            r'RadioButton',
-        ]
-        for indicator in checkbox_indicators:
-            if re.search(indicator, content, re.IGNORECASE):
-                patterns.append({
-                    'type': 'checkbox_radio',
-                    'description': '复选框/单选框',
-                    'file': filepath,
-                    'indicator': indicator
-                })
-        
-        return patterns
+        return self._detect(_INPUT_RES, content, filepath)
 
 
 # ============== 依赖分析 ==============
 
+# 依赖分析用的正则，同样在导入时编译
+_PY_IMPORT_RE = re.compile(rb'^(?:from\s+(\S+)\s+)?import\s+(.+)$', re.MULTILINE)
+_JS_IMPORT_RE = re.compile(rb'import\s+.*?from\s+[\'"](.+?)[\'"]')
+_PY_FUNC_RE = re.compile(rb'def\s+(\w+)\s*\(')
+_JS_FUNC_RE = re.compile(rb'function\s+(?P<fn>\w+)|const\s+(?P<arrow>\w+)\s*=\s*(?:async\s+)?\(')
+_CLASS_RE = re.compile(rb'class\s+(\w+)')
+
+
+def _analyze_python(content: bytes):
+    """用 ast 解析 Python 文件，提取导入模块和定义的符号
+
+    比 import 正则更准确（多行括号导入、行继续符、docstring 里的
+    伪 import 都能正确处理），且 C 实现的解析器只过一遍。
+    解析失败时返回 None，由调用方回退到正则路径。
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    imports: List[str] = []
+    defs: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(alias.name.split('.')[0])
+        elif isinstance(node, ast.ImportFrom):
+            if node.module:
+                imports.append(node.module)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defs.append(node.name)
+    return imports, defs
+
+
+def _analyze_content(content: bytes, filepath: str = '') -> Tuple[List[str], List[str]]:
+    """提取单个文件的导入模块和定义的符号
+
+    独立于 DependencyAnalyzer 的纯函数，便于在工作进程中直接调用。
+    返回的列表可能含重复项，去重推迟到构建依赖图时一次完成。
+    """
+    if filepath.endswith('.py'):
+        result = _analyze_python(content)
+        if result is not None:
+            return result
+
+    imports: List[str] = []
+    defs: List[str] = []
+
+    # Python imports
+    py_imports = _PY_IMPORT_RE.findall(content)
+    for from_module, imported in py_imports:
+        if from_module:
+            imports.append(from_module.decode('utf-8', 'ignore'))
+        for imp in imported.decode('utf-8', 'ignore').split(','):
+            imports.append(imp.strip().split(' as ')[0])
+
+    # JavaScript/TypeScript imports
+    js_imports = _JS_IMPORT_RE.findall(content)
+    for imp in js_imports:
+        imports.append(imp.decode('utf-8', 'ignore'))
+
+    # 函数定义 (Python)
+    py_funcs = _PY_FUNC_RE.findall(content)
+    for func in py_funcs:
+        defs.append(func.decode('utf-8', 'ignore'))
+
+    # 函数定义 (JavaScript)：每个匹配恰好命中一个分组，
+    # 直接用 lastindex 取出，省去逐元组判空
+    for m in _JS_FUNC_RE.finditer(content):
+        defs.append(m.group(m.lastindex).decode('utf-8', 'ignore'))
+
+    # 类定义
+    classes = _CLASS_RE.findall(content)
+    for cls in classes:
+        defs.append(cls.decode('utf-8', 'ignore'))
+
+    return imports, defs
+
+
 class DependencyAnalyzer:
-    """分析代码依赖关系"""
-    
+    """分析代码依赖关系
+
+    按 SoA 布局存储：三个平行数组按文件对齐。每个文件只追加一次，
+    避免按文件路径和符号反复哈希进 set；去重和排序在
+    build_dependency_graph 里一次完成。
+    """
+
     def __init__(self):
-        self.imports = defaultdict(set)  # file -> set of imported modules
-        self.exports = defaultdict(set)  # file -> set of exported symbols
-        self.function_calls = defaultdict(set)  # file -> set of called functions
-        self.function_defs = defaultdict(set)  # file -> set of defined functions
-    
-    def analyze_file(self, content: str, filepath: str):
+        self._files: List[str] = []
+        self._imports: List[List[str]] = []
+        self._defs: List[List[str]] = []
+
+    def analyze_file(self, content: bytes, filepath: str):
         """分析单个文件"""
-        # Python imports
-        py_imports = re.findall(r'^(?:from\s+(\S+)\s+)?import\s+(.+)$', content, re.MULTILINE)
-        for from_module, imports in py_imports:
-            if from_module:
-                self.imports[filepath].add(from_module)
-            for imp in imports.split(','):
-                self.imports[filepath].add(imp.strip().split(' as ')[0])
-        
-        # JavaScript/TypeScript imports
-        js_imports = re.findall(r'import\s+.*?from\s+[\'"](.+?)[\'"]', content)
-        for imp in js_imports:
-            self.imports[filepath].add(imp)
-        
-        # 函数定义 (Python)
-        py_funcs = re.findall(r'def\s+(\w+)\s*\(', content)
-        for func in py_funcs:
-            self.function_defs[filepath].add(func)
-        
-        # 函数定义 (JavaScript)
-        js_funcs = re.findall(r'(?:function\s+(\w+)|const\s+(\w+)\s*=\s*(?:async\s+)?\()', content)
-        for func1, func2 in js_funcs:
-            if func1:
-                self.function_defs[filepath].add(func1)
-            if func2:
-                self.function_defs[filepath].add(func2)
-        
-        # 类定义
-        classes = re.findall(r'class\s+(\w+)', content)
-        for cls in classes:
-            self.function_defs[filepath].add(cls)
-    
+        imports, defs = _analyze_content(content, filepath)
+        self.merge_result(filepath, imports, defs)
+
+    def merge_result(self, filepath: str, imports: List[str], defs: List[str]):
+        """记录单个文件的分析结果"""
+        self._files.append(filepath)
+        self._imports.append(imports)
+        self._defs.append(defs)
+
     def build_dependency_graph(self) -> Dict:
         """构建依赖图"""
         graph = {
             'files': {},
             'symbols': {}
         }
-        
-        for filepath, imports in self.imports.items():
+
+        for i, filepath in enumerate(self._files):
+            imports = self._imports[i]
+            if not imports:
+                continue
             graph['files'][filepath] = {
-                'imports': list(imports),
-                'defines': list(self.function_defs.get(filepath, []))
+                'imports': sorted(set(imports)),
+                'defines': sorted(set(self._defs[i]))
             }
-        
+
         return graph
 
 
 # ============== 主扫描逻辑 ==============
 
-def scan_project(project_path: str) -> Tuple[List[Dict], Dict]:
-    """扫描项目，返回模式列表和依赖图"""
-    project_path = Path(project_path)
+def _iter_source_files(root: str):
+    """递归遍历目录，产出支持扩展名文件的 DirEntry
+
+    使用 os.scandir 代替 os.walk：目录项的类型和 stat 信息随目录
+    读取一次返回，避免为每个文件构造 Path 对象和额外的 stat 调用。
+    读不了的目录直接跳过（与 os.walk 的默认容错行为一致）。
+    """
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in IGNORE_DIRS:
+                    continue
+                yield from _iter_source_files(entry.path)
+            elif entry.name.lower().endswith(EXT_TUPLE):
+                yield entry
+
+
+def _map_file(filepath: str):
+    """以只读 mmap 打开文件，返回可供正则直接匹配的字节视图
+
+    相比 f.read()，mmap 省去一次完整拷贝和 UTF-8 解码；正则引擎
+    直接在页缓存支撑的字节上匹配。空文件或无法打开时返回 None。
+    """
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        if os.fstat(fd).st_size == 0:
+            return None
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+# 文件数低于该值时不值得启动进程池
+_PARALLEL_THRESHOLD = 64
+
+# 扫描缓存文件名（放在输出目录里）
+CACHE_FILENAME = '.scan_cache.json'
+
+
+def _load_cache(cache_path) -> Dict:
+    """读取上次扫描的缓存；不存在或损坏时返回空缓存"""
+    if cache_path is None:
+        return {}
+    try:
+        return json.loads(Path(cache_path).read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path, cache: Dict):
+    """原子地写回扫描缓存（写临时文件再 os.replace）"""
+    if cache_path is None:
+        return
+    tmp_path = str(cache_path) + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_dumps(cache))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 缓存写不进去只影响下次扫描速度，不算错误
+
+
+def _scan_one(paths: Tuple[str, str], max_bytes: int = MAX_SCAN_BYTES):
+    """扫描单个文件（可在工作进程中执行）
+
+    返回 (patterns, rel_path, imports, defs)，文件无法读取时返回 None。
+    """
+    filepath, rel_path = paths
+    content = _map_file(filepath)
+    if content is None:
+        return None
     detector = PatternDetector()
+    try:
+        if max_bytes and len(content) > max_bytes:
+            # 头尾各扫一块就够了：import 和类/函数定义集中在文件头部
+            data = content[:_CHUNK_BYTES] + content[-_CHUNK_BYTES:]
+        else:
+            data = content
+        patterns = detector.detect_save_pattern(data, rel_path)
+        patterns.extend(detector.detect_input_pattern(data, rel_path))
+        imports, defs = _analyze_content(data, rel_path)
+    finally:
+        content.close()
+    return patterns, rel_path, imports, defs
+
+
+def scan_project(project_path: str, max_bytes: int = MAX_SCAN_BYTES,
+                 cache_path=None) -> Tuple[List[Dict], Dict]:
+    """扫描项目，返回模式列表和依赖图
+
+    文件之间互相独立，数量多时用进程池并行扫描（正则匹配是
+    CPU 密集型、不释放 GIL，线程池无益）。
+
+    传入 cache_path 时启用增量扫描：mtime 和大小都没变的文件直接
+    复用上次的结果，重扫成本降为 O(变更文件数)。
+    """
+    project_path = str(Path(project_path))
     analyzer = DependencyAnalyzer()
-    
+
     all_patterns = []
-    
-    for root, dirs, files in os.walk(project_path):
-        # 跳过忽略的目录
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in SUPPORTED_EXTENSIONS:
-                continue
-            
-            filepath = Path(root) / file
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-            except Exception:
-                continue
-            
-            rel_path = str(filepath.relative_to(project_path))
-            
-            # 检测模式
-            save_patterns = detector.detect_save_pattern(content, rel_path)
-            input_patterns = detector.detect_input_pattern(content, rel_path)
-            all_patterns.extend(save_patterns)
-            all_patterns.extend(input_patterns)
-            
-            # 分析依赖
-            analyzer.analyze_file(content, rel_path)
-    
+    root_len = len(project_path) + 1
+
+    # 缓存头记录生成时的 max_bytes：扫描参数变了，分块扫描的旧结果
+    # 就不可信，整个缓存按未命中处理
+    cache = _load_cache(cache_path)
+    cached_files = cache.get('files', {}) if cache.get('max_bytes') == max_bytes else {}
+    new_cache = {}
+    file_stats = {}
+
+    tasks = []
+    for entry in _iter_source_files(project_path):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        rel_path = entry.path[root_len:]
+        cached = cached_files.get(rel_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _, _, patterns, imports, defs = cached
+            all_patterns.extend(patterns)
+            analyzer.merge_result(rel_path, imports, defs)
+            new_cache[rel_path] = cached
+        else:
+            file_stats[rel_path] = (st.st_mtime_ns, st.st_size)
+            tasks.append((entry.path, rel_path))
+
+    scan_one = partial(_scan_one, max_bytes=max_bytes)
+
+    def _collect(result):
+        if result is None:
+            return
+        patterns, rel_path, imports, defs = result
+        all_patterns.extend(patterns)
+        analyzer.merge_result(rel_path, imports, defs)
+        mtime_ns, size = file_stats[rel_path]
+        new_cache[rel_path] = (mtime_ns, size, patterns, imports, defs)
+
+    if len(tasks) >= _PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor() as executor:
+            for result in executor.map(scan_one, tasks, chunksize=64):
+                _collect(result)
+    else:
+        for task in tasks:
+            _collect(scan_one(task))
+
+    _save_cache(cache_path, {'max_bytes': max_bytes, 'files': new_cache})
+
     dependency_graph = analyzer.build_dependency_graph()
-    
+
     return all_patterns, dependency_graph
 
 
@@ -280,51 +460,52 @@ def generate_patterns_md(patterns: List[Dict]) -> str:
         else:
             input_types[p['type']].append(p)
     
-    md = """# 项目交互模式
+    # 用列表累积片段、最后一次 join，避免 += 反复复制整串
+    parts = ["""# 项目交互模式
 
 > 此文件由 Project Guardian 自动生成
 > 请检查并修改以确保准确性
 
 ## 保存模式
 
-"""
-    
+"""]
+
     save_type_names = {
         'realtime': '实时保存',
         'button': '按钮保存',
         'on_close': '关闭时保存'
     }
-    
+
     for save_type, name in save_type_names.items():
         if save_types[save_type]:
-            md += f"### {name}\n\n"
-            md += "| 文件 | 检测指标 |\n"
-            md += "|------|----------|\n"
+            parts.append(f"### {name}\n\n")
+            parts.append("| 文件 | 检测指标 |\n")
+            parts.append("|------|----------|\n")
             for p in save_types[save_type][:5]:  # 最多显示5个
-                md += f"| `{p['file']}` | {p['indicator']} |\n"
-            md += "\n"
-    
-    md += """## 输入模式
+                parts.append(f"| `{p['file']}` | {p['indicator']} |\n")
+            parts.append("\n")
+
+    parts.append("""## 输入模式
+
+""")
 
-"""
-    
     input_type_names = {
         'dropdown': '下拉菜单',
         'text_input': '文本输入框',
         'list_select': '列表选择',
         'checkbox_radio': '复选框/单选框'
     }
-    
+
     for input_type, name in input_type_names.items():
         if input_types[input_type]:
-            md += f"### {name}\n\n"
-            md += "| 文件 | 检测指标 |\n"
-            md += "|------|----------|\n"
+            parts.append(f"### {name}\n\n")
+            parts.append("| 文件 | 检测指标 |\n")
+            parts.append("|------|----------|\n")
             for p in input_types[input_type][:5]:
-                md += f"| `{p['file']}` | {p['indicator']} |\n"
-            md += "\n"
-    
-    md += """## 总结
+                parts.append(f"| `{p['file']}` | {p['indicator']} |\n")
+            parts.append("\n")
+
+    parts.append("""## 总结
 
 基于扫描结果，建议在本项目中遵循以下规则：
 
@@ -332,9 +513,9 @@ def generate_patterns_md(patterns: List[Dict]) -> str:
 2. **输入模式**：[ ] 请根据上述检测结果填写主要的输入模式
 
 > 请编辑此部分，明确项目应遵循的交互模式
-"""
-    
-    return md
+""")
+
+    return ''.join(parts)
 
 
 def generate_user_rules_md() -> str:
@@ -377,6 +558,10 @@ def main():
     parser = argparse.ArgumentParser(description='Project Guardian - 项目规则扫描器')
     parser.add_argument('--path', '-p', required=True, help='项目路径')
     parser.add_argument('--output', '-o', help='输出目录 (默认: 项目路径/.ai-guardian)')
+    parser.add_argument('--max-bytes', type=int, default=MAX_SCAN_BYTES,
+                        help='超过该大小的文件只扫描头尾各 128KiB (0 表示不限制)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='忽略并不更新扫描缓存，强制全量重扫')
     args = parser.parse_args()
     
     project_path = Path(args.path).resolve()
@@ -390,29 +575,35 @@ def main():
     print(f"正在扫描项目: {project_path}")
     print("-" * 50)
     
-    patterns, dependency_graph = scan_project(project_path)
+    cache_path = None if args.no_cache else output_dir / CACHE_FILENAME
+    patterns, dependency_graph = scan_project(project_path, max_bytes=args.max_bytes,
+                                              cache_path=cache_path)
     
     print(f"检测到 {len(patterns)} 个交互模式")
     print(f"分析了 {len(dependency_graph['files'])} 个文件的依赖关系")
     
+    # 输出都先编码成完整的 bytes，再用大缓冲二进制句柄一次写出，
+    # 避免默认 8 KiB 文本缓冲把大文件拆成上百次 write 系统调用
+    write_buffer = 1 << 20
+
     # 生成 patterns.md
     patterns_md = generate_patterns_md(patterns)
     patterns_path = output_dir / 'patterns.md'
-    with open(patterns_path, 'w', encoding='utf-8') as f:
-        f.write(patterns_md)
+    with open(patterns_path, 'wb', buffering=write_buffer) as f:
+        f.write(patterns_md.encode('utf-8'))
     print(f"已生成: {patterns_path}")
-    
+
     # 生成 relations.json
     relations_path = output_dir / 'relations.json'
-    with open(relations_path, 'w', encoding='utf-8') as f:
-        json.dump(dependency_graph, f, indent=2, ensure_ascii=False)
+    with open(relations_path, 'wb', buffering=write_buffer) as f:
+        f.write(_dumps(dependency_graph))
     print(f"已生成: {relations_path}")
-    
+
     # 生成 user-rules.md (如果不存在)
     user_rules_path = output_dir / 'user-rules.md'
     if not user_rules_path.exists():
-        with open(user_rules_path, 'w', encoding='utf-8') as f:
-            f.write(generate_user_rules_md())
+        with open(user_rules_path, 'wb', buffering=write_buffer) as f:
+            f.write(generate_user_rules_md().encode('utf-8'))
         print(f"已生成: {user_rules_path}")
     else:
         print(f"已存在: {user_rules_path} (跳过)")